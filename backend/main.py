@@ -8,16 +8,34 @@ Features:
 - Recommendation scoring based on user preferences.
 """
 
+import asyncio
 import csv
+import hashlib
+import hmac
 import io
-import json
 import math
+import mmap
 import os
-from typing import Any, Dict, List, Optional, Tuple
+import sys
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import quote
 
 import httpx
+import numpy as np
+import orjson
 from fastapi import FastAPI, File, Header, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+
+# Optional: pyarrow's multi-threaded C++ CSV reader makes large imports
+# roughly an order of magnitude faster. Everything works without it.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -29,12 +47,22 @@ from pydantic import BaseModel
 # Sits next to this script so it's easy to find / back up.
 DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books_db.json")
 
+# Persistent cache of resolved cover URLs, keyed by a hash of (title|author).
+# JSONL: one {key: url} object per line, appended write-through.
+COVER_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "covers_cache.json")
+
+# Keep at most this many entries in the cover cache (oldest evicted first).
+COVER_CACHE_MAX_ENTRIES = 50_000
+
 # Admin key for protecting write endpoints (edit, delete, upload).
 # Change this to your own secret. You can also set the ADMIN_KEY env variable.
 ADMIN_KEY = os.environ.get("ADMIN_KEY", "sri2026books")
 
 # Columns expected in the uploaded CSV (book_ID is NOT required; auto-generated)
-CSV_COLUMNS = [
+# Interned: these strings are dict keys in every book record, so interning
+# makes all N books share the same ~14 key objects and turns key lookups
+# into pointer compares.
+CSV_COLUMNS = tuple(sys.intern(c) for c in (
     "book_title",
     "book_author",
     "sri_Rating",
@@ -45,13 +73,16 @@ CSV_COLUMNS = [
     "Mood_Finish",
     "Pace",
     "Plot_Character",
-]
+))
 
 # All columns stored in the database (CSV columns + ID + derived title fields)
 # - book_ID           : auto-generated sequential integer
 # - goodreads_title   : used for display (defaults to book_title on import)
 # - cover_search_title: used to search for cover images (Open Library / Google Books)
-DB_COLUMNS = ["book_ID"] + CSV_COLUMNS + ["goodreads_title", "cover_search_title", "cover_image_url"]
+# A tuple: iterated in several tight comparison loops and never mutated.
+DB_COLUMNS = tuple(sys.intern(c) for c in (
+    "book_ID", *CSV_COLUMNS, "goodreads_title", "cover_search_title", "cover_image_url"
+))
 
 # Genre_Intent is used as a FILTER (not scored).
 # These remaining fields are used for recommendation SCORING.
@@ -75,74 +106,325 @@ books_db: Dict[str, Dict[str, Any]] = {}
 # Cleared on every new upload.
 pending_conflicts: Dict[str, Dict[str, Any]] = {}
 
+# Highest numeric book_ID seen so far. Seeded by load_db, bumped on insert,
+# so generating the next ID is O(1) instead of a scan over the whole DB.
+_max_book_id: int = 0
+
+# Secondary index: normalized "title|author" → key in books_db.
+# Lets upload dedup find an existing book in O(1) instead of rescanning
+# (and re-normalizing) every stored book per CSV row. Kept in sync by
+# load_db and every add/edit/delete path.
+_key_index: Dict[str, str] = {}
+
+# Bloom filter fronting _key_index: a cache-resident definite-miss fast
+# path for upload dedup. Most rows of a fresh import are NOT duplicates,
+# and the bloom answers "definitely new" from 3 bit probes without touching
+# the dict. 2^20 bits = 128 KB; deletions are ignored (a stale positive
+# just falls back to the authoritative dict lookup).
+_BLOOM_BITS = 1 << 20
+_bloom = bytearray(_BLOOM_BITS // 8)
+
+
+def _bloom_probes(key: str):
+    """Yield 3 bit positions for a key, derived from one blake2b digest."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).digest()
+    for i in (0, 4, 8):
+        yield int.from_bytes(digest[i:i + 4], "little") % _BLOOM_BITS
+
+
+def _bloom_add(key: str) -> None:
+    for bit in _bloom_probes(key):
+        _bloom[bit >> 3] |= 1 << (bit & 7)
+
+
+def _bloom_contains(key: str) -> bool:
+    """False → key is definitely not indexed. True → probably indexed."""
+    return all(_bloom[bit >> 3] & (1 << (bit & 7)) for bit in _bloom_probes(key))
+
+
+def _index_add(ta_key: str, db_key: str) -> None:
+    """Register a book's title|author key in the index and the bloom filter."""
+    _key_index[ta_key] = db_key
+    _bloom_add(ta_key)
+
+
+# Keys of books whose cover_image_url is empty. Lets /resolve-covers visit
+# only the records that need work instead of scanning the whole database.
+# Kept in sync by load_db and every path that adds or rewrites a record.
+_missing_covers: Set[str] = set()
+
+
+def _track_cover(db_key: str, book: Dict[str, Any]) -> None:
+    """Add or drop the book from the missing-covers set to match its record."""
+    if book.get("cover_image_url"):
+        _missing_covers.discard(db_key)
+    else:
+        _missing_covers.add(db_key)
+
 
 # =============================================================================
 # Persistence helpers
 # =============================================================================
 
+# The DB file is an append-only log: each line is either a bare book object
+# (a snapshot record, i.e. an upsert) or an op record like
+# {"op": "upsert", "book": {...}} / {"op": "delete", "id": "..."}.
+# Mutations append one op instead of rewriting the whole file; load_db
+# replays the log in order, and the log is compacted back to a plain
+# snapshot once it grows past ~2x the live set.
+_log_fh = None           # append-mode handle, opened lazily
+_log_records: int = 0    # records currently in the log file
+
+# Appends run from several threadpool threads (batch persists during
+# upload, the sync admin endpoints), and an append can trigger compaction
+# which closes and replaces the shared handle. One reentrant lock around
+# append and snapshot keeps handle/counter updates atomic; appends are
+# tiny, so contention is irrelevant at this scale.
+_log_lock = threading.RLock()
+
+# Compact only once the log is at least this long, so tiny databases don't
+# compact on every other write.
+_COMPACT_MIN_RECORDS = 64
+
+# Appends flush to the OS buffers immediately but the fsync is coalesced:
+# each append signals the background flusher (started at app startup),
+# which syncs the log handle once per burst instead of once per record.
+# A hard machine crash can lose at most the last interval of acknowledged
+# writes; a plain process death loses nothing because the data is already
+# flushed out of the process.
+_FSYNC_INTERVAL = 0.25
+_fsync_event: Optional[asyncio.Event] = None
+_fsync_task = None
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _fsync_log() -> None:
+    """Sync the log handle to disk, if one is open."""
+    fh = _log_fh
+    if fh is None:
+        return
+    try:
+        os.fsync(fh.fileno())
+    except (ValueError, OSError):
+        # A concurrent compaction can close the handle between the check
+        # and the fsync. Nothing is lost: the next append reopens the log
+        # and signals the flusher again.
+        pass
+
+
+def _request_fsync() -> None:
+    """
+    Ask the background flusher to sync the log. Before the flusher exists
+    (startup migrations, scripts importing this module) sync inline instead,
+    preserving the old write-through durability.
+    """
+    if _fsync_event is None or _main_loop is None:
+        _fsync_log()
+        return
+    # Appends run in worker threads; Event.set must happen on the loop.
+    _main_loop.call_soon_threadsafe(_fsync_event.set)
+
+
+async def _fsync_worker() -> None:
+    """Coalesce fsync requests: sleep out each burst, then sync once."""
+    while True:
+        await _fsync_event.wait()
+        await asyncio.sleep(_FSYNC_INTERVAL)
+        _fsync_event.clear()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _fsync_log)
+        except Exception:
+            # One failed sync must not kill the flusher for the rest of
+            # the process; the next append re-signals and we try again.
+            pass
+
+
+def _get_log_fh():
+    """Lazily open (and cache) the append-mode log handle."""
+    global _log_fh
+    if _log_fh is None:
+        _log_fh = open(DB_FILE, "ab")
+    return _log_fh
+
+
+def _append_op(op: str, book: Optional[Dict[str, Any]] = None, book_id: Optional[str] = None) -> None:
+    """
+    Append a single mutation to the DB log, flush it, and schedule a
+    coalesced fsync (see _fsync_worker).
+    Cost is O(one book), not O(whole database) like a full rewrite.
+    Triggers compaction when the log has grown well past the live set.
+    """
+    global _log_records
+    record: Dict[str, Any] = {"op": op}
+    if book is not None:
+        record["book"] = book
+    if book_id is not None:
+        record["id"] = book_id
+    if book is not None:
+        # Every persisted write passes through here, so the cached equality
+        # hash can never go stale on disk.
+        book["content_hash"] = _content_hash(book)
+    with _log_lock:
+        fh = _get_log_fh()
+        fh.write(orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+        fh.flush()
+        _request_fsync()
+        _log_records += 1
+        if _log_records > max(_COMPACT_MIN_RECORDS, 2 * len(books_db)):
+            compact_db()
+
+
+def compact_db() -> None:
+    """Rewrite the log as a fresh snapshot, dropping superseded records."""
+    save_db()
+    print(f"[DB] Compacted log down to {len(books_db)} records.")
+
+
+def _migrate_book(book: Dict[str, Any]) -> bool:
+    """
+    Bring an on-disk book record up to the current schema in place.
+    Returns True if anything had to change (so the caller can re-save).
+    """
+    migrated = False
+    # Migrate: if older records don't have the title fields, add them
+    if "goodreads_title" not in book:
+        book["goodreads_title"] = book.get("book_title", "")
+        migrated = True
+    if "cover_search_title" not in book:
+        book["cover_search_title"] = book.get("googlebooks_title", "") or book.get("book_title", "")
+        migrated = True
+    if "cover_image_url" not in book:
+        book["cover_image_url"] = ""
+        migrated = True
+    # Remove old field name if present
+    if book.pop("googlebooks_title", None) is not None:
+        migrated = True
+    if "content_hash" not in book:
+        book["content_hash"] = _content_hash(book)
+        migrated = True
+    return migrated
+
 
 def load_db() -> None:
     """
-    Load books from the JSON file on disk into the in-memory dict.
+    Load books from the file on disk into the in-memory dict.
     Called once when the server starts.
-    If the file doesn't exist yet, start with an empty database.
+
+    The current format is a JSON Lines log (see _append_op): snapshot
+    records and upsert/delete ops are replayed in order, record by record,
+    instead of materializing one whole array first. Files written by older
+    versions start with "[" (a single JSON array); those are still read and
+    get rewritten on the first save. If the file doesn't exist yet, start
+    with an empty database.
     """
-    global books_db
-    if os.path.exists(DB_FILE):
-        with open(DB_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # data is a list of book dicts → convert to dict keyed by book_ID
+    global books_db, _max_book_id, _log_records
+    _max_book_id = 0
+    _log_records = 0
+    _key_index.clear()
+    _missing_covers.clear()
+    _bloom[:] = bytes(len(_bloom))
+    if os.path.exists(DB_FILE) and os.path.getsize(DB_FILE) > 0:
         books_db = {}
         migrated = False
-        for book in data:
-            # Migrate: if older records don't have the title fields, add them
-            if "goodreads_title" not in book:
-                book["goodreads_title"] = book.get("book_title", "")
-                migrated = True
-            if "cover_search_title" not in book:
-                book["cover_search_title"] = book.get("googlebooks_title", "") or book.get("book_title", "")
-                migrated = True
-            if "cover_image_url" not in book:
-                book["cover_image_url"] = ""
-                migrated = True
-            # Remove old field name if present
-            book.pop("googlebooks_title", None)
-            key = _book_key(book)
-            books_db[key] = book
+        with open(DB_FILE, "rb") as f:
+            # Memory-map the file instead of reading it into a bytes object:
+            # the kernel pages content in lazily and no intermediate copy of
+            # the whole file lives on the Python heap during parsing.
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                if mm[:1] == b"[":
+                    # Legacy format: one big JSON array.
+                    records = orjson.loads(memoryview(mm))
+                    migrated = True  # force a save so the file becomes JSONL
+                else:
+                    # JSONL log: stream one record per line.
+                    records = (orjson.loads(line) for line in iter(mm.readline, b"") if line.strip())
+                for record in records:
+                    _log_records += 1
+                    if "op" in record:
+                        if record["op"] == "delete":
+                            key = str(record.get("id", ""))
+                            removed = books_db.pop(key, None)
+                            if removed is not None and _key_index.get(_ta_key(removed)) == key:
+                                del _key_index[_ta_key(removed)]
+                            _missing_covers.discard(key)
+                            continue
+                        book = record.get("book") or {}
+                    else:
+                        # Bare book object: a snapshot record (implicit upsert)
+                        book = record
+                    # orjson allocates fresh key strings per record; intern
+                    # them so every book shares one object per column name.
+                    book = {sys.intern(k): v for k, v in book.items()}
+                    if _migrate_book(book):
+                        migrated = True
+                    _stamp_derived(book)
+                    key = _book_key(book)
+                    books_db[key] = book
+                    _index_add(_ta_key(book), key)
+                    _track_cover(key, book)
+                    _register_book_id(book.get("book_ID"))
+            finally:
+                mm.close()
         print(f"[DB] Loaded {len(books_db)} books from {DB_FILE}")
         if migrated:
             save_db()
-            print("[DB] Migrated existing books to include goodreads_title & cover_search_title.")
+            print("[DB] Migrated existing books to the current schema/format.")
     else:
         books_db = {}
         print(f"[DB] No existing database found. Starting fresh.")
+    _mark_soa_dirty()
 
 
 def save_db() -> None:
     """
-    Persist the current in-memory book dict back to disk as a JSON array.
-    Called after any mutation (add / update).
+    Write a full snapshot of the in-memory book dict to disk as JSON Lines
+    (one book object per line). Used for migration and log compaction;
+    ordinary mutations go through _append_op instead.
+    Serializes with orjson (much faster than stdlib json) and writes to a
+    temp file + os.replace so a crash mid-write never corrupts the DB.
     """
-    data = list(books_db.values())
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"[DB] Saved {len(data)} books to {DB_FILE}")
+    global _log_fh, _log_records
+    with _log_lock:
+        if _log_fh is not None:
+            # The log file is about to be replaced; drop the stale handle.
+            _log_fh.close()
+            _log_fh = None
+        tmp = DB_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            for book in books_db.values():
+                f.write(orjson.dumps(book, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+        os.replace(tmp, DB_FILE)
+        _log_records = len(books_db)
+    _mark_soa_dirty()
+    print(f"[DB] Saved {len(books_db)} books to {DB_FILE}")
+
+
+def _register_book_id(book_id: Any) -> None:
+    """
+    Keep the _max_book_id counter in sync when a book with a pre-assigned
+    numeric ID enters the database (legacy CSVs can carry their own IDs).
+    Non-numeric IDs are ignored.
+    """
+    global _max_book_id
+    try:
+        bid = int(book_id)
+    except (TypeError, ValueError):
+        return
+    if bid > _max_book_id:
+        _max_book_id = bid
 
 
 def _next_book_id() -> str:
     """
-    Generate the next sequential book_ID.
-    Scans existing IDs, finds the max numeric one, and returns max + 1 as a string.
+    Generate the next sequential book_ID in O(1) by bumping the cached
+    max counter (seeded from the DB by load_db).
     """
-    max_id = 0
-    for book in books_db.values():
-        try:
-            bid = int(book.get("book_ID", 0))
-            if bid > max_id:
-                max_id = bid
-        except (TypeError, ValueError):
-            pass
-    return str(max_id + 1)
+    global _max_book_id
+    _max_book_id += 1
+    return str(_max_book_id)
 
 
 def _book_key(book: Dict[str, Any]) -> str:
@@ -155,9 +437,20 @@ def _book_key(book: Dict[str, Any]) -> str:
     if bid:
         return bid
     # Fallback: title + author combo
-    title = str(book.get("book_title", "")).strip().lower()
-    author = str(book.get("book_author", "")).strip().lower()
-    return f"{title}|{author}"
+    return _ta_key(book)
+
+
+def _ta_key(book: Dict[str, Any]) -> str:
+    """
+    Normalized 'title|author' string used for dedup lookups in _key_index.
+    str.join over the two cached-normalized parts — one output allocation,
+    no f-string formatting machinery, and recurring titles/authors come
+    straight from the normalize LRU.
+    """
+    return "|".join((
+        normalize(book.get("book_title", "")),
+        normalize(book.get("book_author", "")),
+    ))
 
 
 # =============================================================================
@@ -180,9 +473,14 @@ app.add_middleware(
 
 
 @app.on_event("startup")
-def startup():
-    """Load the persistent book database when the server starts."""
+async def startup():
+    """Load the persistent book database and cover cache when the server starts."""
+    global _fsync_event, _fsync_task, _main_loop
     load_db()
+    load_cover_cache()
+    _main_loop = asyncio.get_running_loop()
+    _fsync_event = asyncio.Event()
+    _fsync_task = asyncio.create_task(_fsync_worker())
 
 
 @app.get("/health")
@@ -200,61 +498,166 @@ def require_admin(x_admin_key: Optional[str]) -> None:
     """
     Check the X-Admin-Key header against the configured ADMIN_KEY.
     Raises 403 if missing or wrong. Used on all write endpoints.
+    Compared in constant time so response timing leaks nothing about
+    how much of a guessed key matched.
     """
-    if not x_admin_key or x_admin_key != ADMIN_KEY:
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), ADMIN_KEY.encode()):
         raise HTTPException(status_code=403, detail="Forbidden. Invalid admin key.")
 
 
+def _as_float(value: Any, default: float = 0.0) -> float:
+    """Coerce a possibly-string value to float: empty → 0, unparsable → default."""
+    if type(value) is float:
+        return value
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return default
+
+
+def _as_int(value: Any, default: int = 0) -> int:
+    """Coerce a possibly-string value to int: empty → 0, unparsable → default."""
+    if type(value) is int:
+        return value
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return default
+
+
+@lru_cache(maxsize=1 << 16)
 def normalize(value: Optional[str]) -> str:
-    """Normalize a value for comparison: strip whitespace, lowercase."""
+    """
+    Normalize a value for comparison: strip whitespace, lowercase.
+    Memoized because the same inputs recur constantly on hot paths
+    (titles/authors during bulk upload dedup, category values, user
+    preferences); the bounded cache keeps misbehaving input from
+    growing it without limit.
+    """
     if value is None:
         return ""
     return str(value).strip().lower()
 
 
-def parse_book_row(row: Dict[str, str]) -> Dict[str, Any]:
+def parse_book_row(row: Any, idx: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
     """
-    Take a raw CSV row dict and return a clean book dict
+    Take a raw CSV row and return a clean book dict
     with only the expected columns and proper types.
+    `row` is either a mapping (pyarrow path) or a positional list from
+    csv.reader, in which case `idx` maps column name → position.
     book_ID is NOT expected from CSV — it will be assigned separately.
     On initial import, both goodreads_title and cover_search_title
     are set to book_title (the CSV value). They can be edited
     independently later via the admin panel.
     """
+    if idx is None:
+        get = row.get
+    else:
+        def get(col: str, default: str = "") -> Any:
+            i = idx.get(col)
+            return row[i] if i is not None and i < len(row) else default
+
     book: Dict[str, Any] = {}
     for col in CSV_COLUMNS:
-        book[col] = str(row.get(col, "")).strip()
+        val = get(col, "")
+        # pyarrow hands numeric columns over already typed (and nulls as
+        # None); plain csv rows are all strings and need the strip.
+        book[col] = val if isinstance(val, (int, float)) else str(val or "").strip()
     # If the CSV happens to include book_ID (legacy format), keep it
-    if "book_ID" in row and str(row["book_ID"]).strip():
-        book["book_ID"] = str(row["book_ID"]).strip()
-    else:
-        book["book_ID"] = ""  # Will be assigned by the upload endpoint
+    book["book_ID"] = str(get("book_ID", "") or "").strip()  # "" → assigned on upload
     # Convert numeric fields for easier use later
     for num_field in ["sri_Rating", "goodreads_avg_rating"]:
-        try:
-            book[num_field] = float(book[num_field]) if book[num_field] else 0.0
-        except (TypeError, ValueError):
-            book[num_field] = 0.0
+        book[num_field] = _as_float(book[num_field])
     for int_field in ["goodreads_rating_count", "page_count"]:
-        try:
-            book[int_field] = int(book[int_field]) if book[int_field] else 0
-        except (TypeError, ValueError):
-            book[int_field] = 0
+        book[int_field] = _as_int(book[int_field])
     # Set both display and image-fetch titles to the CSV title initially
     title = book["book_title"]
-    book["goodreads_title"] = str(row.get("goodreads_title", "")).strip() or title
-    book["cover_search_title"] = str(row.get("cover_search_title", "")).strip() or title
+    book["goodreads_title"] = str(get("goodreads_title", "") or "").strip() or title
+    book["cover_search_title"] = str(get("cover_search_title", "") or "").strip() or title
     book["cover_image_url"] = ""  # Will be resolved after insertion
+    _stamp_derived(book)
     return book
 
 
+def _read_csv_rows(source: Any) -> Tuple[List[Any], Optional[Dict[str, int]]]:
+    """
+    Parse an uploaded CSV stream into (rows, column_index).
+    `source` is the upload's (binary, seekable) spooled temp file; parsing
+    reads straight from it, so the raw bytes are never duplicated on the
+    heap and peak memory is bounded by the parsed rows alone.
+    With pyarrow installed, rows are dicts from the multi-threaded C++
+    reader (numeric columns typed during the parse) and column_index is
+    None. The stdlib fallback uses csv.reader and returns positional rows
+    plus a column→index map — no per-row dict, one tuple of fields instead
+    of O(columns) hash inserts per row (see parse_book_row).
+    Raises UnicodeDecodeError for non-UTF-8 input.
+    """
+    if pa_csv is not None:
+        try:
+            table = pa_csv.read_csv(
+                source,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={
+                        "sri_Rating": pa.float32(),
+                        "goodreads_avg_rating": pa.float32(),
+                        "goodreads_rating_count": pa.int32(),
+                        "page_count": pa.int32(),
+                    },
+                    strings_can_be_null=True,
+                ),
+            )
+            return table.to_pylist(), None
+        except Exception:
+            # Anything arrow can't handle (odd quoting, mixed types, ...)
+            # falls through to the forgiving stdlib reader.
+            source.seek(0)
+    text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return [], None
+        idx = {name: i for i, name in enumerate(header)}
+        return [row for row in reader if row], idx
+    finally:
+        # Hand the underlying file back to FastAPI without closing it
+        text.detach()
+
+
+def _content_hash(book: Dict[str, Any]) -> str:
+    """
+    Hash of every DB_COLUMNS field (stringified, same as the equality rules).
+    Stored on the record as 'content_hash' so unchanged upload rows can be
+    detected with one hash compare instead of a field-by-field walk.
+    """
+    payload = orjson.dumps({col: str(book.get(col, "")) for col in DB_COLUMNS})
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _book_hash(book: Dict[str, Any]) -> str:
+    """Return the cached content hash, computing and storing it if missing."""
+    h = book.get("content_hash")
+    if not h:
+        h = book["content_hash"] = _content_hash(book)
+    return h
+
+
 def books_are_equal(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
     """
-    Compare two book dicts field-by-field for all DB_COLUMNS.
-    Returns True if every field is identical (after converting to string for safety).
+    Compare two book dicts for all DB_COLUMNS.
+    Fast path: the cached content hashes differ → not equal. On matching
+    hashes, fall through to the field-by-field compare purely as a guard
+    against the (practically impossible) collision.
     """
+    if _book_hash(old) != _book_hash(new):
+        return False
+    # Hoist the bound methods out of the loop; operator.itemgetter would be
+    # one C call but can't express the .get("", default) semantics for
+    # records that miss a column.
+    old_get = old.get
+    new_get = new.get
     for col in DB_COLUMNS:
-        if str(old.get(col, "")) != str(new.get(col, "")):
+        if str(old_get(col, "")) != str(new_get(col, "")):
             return False
     return True
 
@@ -265,40 +668,277 @@ def diff_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str,
     Format:  { "field_name": { "old": "...", "new": "..." }, ... }
     """
     diffs: Dict[str, Dict[str, str]] = {}
+    old_get = old.get
+    new_get = new.get
     for col in DB_COLUMNS:
-        old_val = str(old.get(col, ""))
-        new_val = str(new.get(col, ""))
+        old_val = str(old_get(col, ""))
+        new_val = str(new_get(col, ""))
         if old_val != new_val:
             diffs[col] = {"old": old_val, "new": new_val}
     return diffs
 
 
+def _public_book(book: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a book record with only the DB_COLUMNS the API has always
+    served. Derived bookkeeping (cached category codes, sort keys, the
+    content hash) stays internal to the process and the log instead of
+    bloating every response row.
+    """
+    return {col: book[col] for col in DB_COLUMNS if col in book}
+
+
+def _json_stream(prelude: bytes, items: Any, postlude: bytes):
+    """
+    Yield a JSON body piece by piece: the prelude (opening the envelope and
+    an array), each item serialized with orjson and comma-joined, then the
+    postlude (closing the array and the rest of the envelope). Streaming
+    keeps a large response's peak memory at one serialized item instead of
+    the whole encoded body.
+    """
+    yield prelude
+    first = True
+    for item in items:
+        if first:
+            first = False
+        else:
+            yield b","
+        yield orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS)
+    yield postlude
+
+
+# =============================================================================
+# Columnar (SoA) view of the book database for vectorized scoring
+# =============================================================================
+
+# /recommend used to iterate book dicts in Python, doing per-field string
+# compares for every book on every request. Instead we keep parallel NumPy
+# arrays (structure-of-arrays): categorical fields as small int codes,
+# page_count as int32, ratings as float32. Scoring then becomes a handful of
+# vectorized array ops over all books at once.
+
+# Categorical fields that get an integer-code column.
+SOA_CATEGORY_FIELDS = ("Genre_Intent",) + tuple(SCORING_FIELDS)
+
+# Row i of every array describes _soa_books[i] (a reference into books_db).
+_soa_books: List[Dict[str, Any]] = []
+_soa_arrays: Dict[str, np.ndarray] = {}
+
+# Writes are rare and reads dominate, so the arrays are rebuilt lazily:
+# mutations just flip this flag and the next /recommend pays for one rebuild.
+_soa_dirty: bool = True
+
+# Per-field mapping of normalized category string → int code, assigned on
+# first sight. The tables only grow, so codes stay valid for the lifetime
+# of the process; each book carries its codes in '<field>_code' entries set
+# at parse/load time, making the array rebuild a plain gather instead of
+# N string normalizations. Codes are process-local: load_db re-stamps them
+# on every loaded record, so values persisted by an older process are
+# simply overwritten before use.
+_soa_codes: Dict[str, Dict[str, int]] = {}
+
+
+def _soa_code(field: str, value: Any) -> int:
+    """Return the int code for a categorical value, assigning one if new."""
+    codes = _soa_codes.setdefault(field, {})
+    key = normalize(value)
+    code = codes.get(key)
+    if code is None:
+        code = len(codes)
+        codes[key] = code
+    return code
+
+
+# 'length' preference → bucket index. Buckets mirror the page ranges the
+# recommend endpoint always used: short ≤200, medium 201–400, long 401–600,
+# epic 601–100k. Each book carries its bucket so length matching is a single
+# vectorized equality instead of a per-request range check.
+LENGTH_CODES = {"short": 0, "medium": 1, "long": 2, "epic": 3}
+
+
+def _length_bucket(page_count: Any) -> int:
+    """Bucket index for a page count (see LENGTH_CODES); -1 = no bucket."""
+    pages = _as_int(page_count, default=-1)
+    if pages < 0:
+        return -1
+    if pages <= 200:
+        return 0
+    if pages <= 400:
+        return 1
+    if pages <= 600:
+        return 2
+    if pages <= 100_000:
+        return 3
+    return -1
+
+
+# Source fields whose change invalidates the derived per-book values below.
+_DERIVED_SOURCE_FIELDS = SOA_CATEGORY_FIELDS + (
+    "page_count", "sri_Rating", "goodreads_avg_rating", "goodreads_rating_count",
+)
+
+
+def _stamp_category_codes(book: Dict[str, Any]) -> None:
+    """Store the int codes of the categorical fields and length bucket."""
+    for field in SOA_CATEGORY_FIELDS:
+        book[field + "_code"] = _soa_code(field, book.get(field))
+    book["length_bucket"] = _length_bucket(book.get("page_count"))
+
+
+def _compute_sort_key(book: Dict[str, Any]) -> None:
+    """
+    Cache the numeric ranking fields so /books/all and /recommend never
+    have to coerce possibly-string ratings per request: _sort_sri is the
+    rating as float, _sort_gr_pop the Goodreads popularity R * log1p(v).
+    """
+    gr_r = _as_float(book.get("goodreads_avg_rating"))
+    gr_v = _as_int(book.get("goodreads_rating_count"))
+    book["_sort_sri"] = _as_float(book.get("sri_Rating"))
+    book["_sort_gr_pop"] = gr_r * math.log1p(gr_v) if gr_v > 0 else 0.0
+
+
+def _stamp_derived(book: Dict[str, Any]) -> None:
+    """Refresh all derived per-book fields: codes, bucket, cached sort keys."""
+    _stamp_category_codes(book)
+    _compute_sort_key(book)
+
+
+# Cached result of the /books/all sort, shared across requests and rebuilt
+# lazily after a write (same lifecycle as the columnar arrays above).
+_sorted_cache: Optional[List[Dict[str, Any]]] = None
+
+
+def _mark_soa_dirty() -> None:
+    """Flag the derived read views stale; called from every mutation path."""
+    global _soa_dirty, _sorted_cache
+    _soa_dirty = True
+    _sorted_cache = None
+
+
+def _ensure_soa() -> None:
+    """Rebuild the columnar arrays if any mutation happened since last use."""
+    if _soa_dirty:
+        rebuild_soa()
+
+
+def rebuild_soa() -> None:
+    """Rebuild the columnar arrays from books_db (see _ensure_soa)."""
+    global _soa_books, _soa_arrays, _soa_dirty
+    books = list(books_db.values())
+    n = len(books)
+    arrays: Dict[str, np.ndarray] = {
+        field: np.empty(n, dtype=np.int16) for field in SOA_CATEGORY_FIELDS
+    }
+    arrays["page_count"] = np.zeros(n, dtype=np.int32)
+    arrays["length_bucket"] = np.full(n, -1, dtype=np.int8)
+    arrays["sri_rating"] = np.zeros(n, dtype=np.float32)
+    arrays["gr_popularity"] = np.zeros(n, dtype=np.float32)
+    for i, book in enumerate(books):
+        for field in SOA_CATEGORY_FIELDS:
+            code = book.get(field + "_code")
+            arrays[field][i] = code if code is not None else _soa_code(field, book.get(field))
+        bucket = book.get("length_bucket")
+        arrays["length_bucket"][i] = bucket if bucket is not None else _length_bucket(book.get("page_count"))
+        arrays["page_count"][i] = _as_int(book.get("page_count"))
+        if "_sort_sri" not in book:
+            _compute_sort_key(book)
+        arrays["sri_rating"][i] = book["_sort_sri"]
+        arrays["gr_popularity"][i] = book["_sort_gr_pop"]
+    _soa_books = books
+    _soa_arrays = arrays
+    _soa_dirty = False
+
+
 # =============================================================================
 # Cover image resolution
 # =============================================================================
 
 # Shared HTTP client – reused across requests for connection pooling.
-_http_client: Optional[httpx.Client] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Cap on concurrent cover lookups so batch resolution doesn't hammer
+# Open Library / Google Books.
+_cover_semaphore = asyncio.Semaphore(16)
+
+# In-memory view of COVER_CACHE_FILE: cover-key → cover URL.
+# Insertion-ordered dict doubles as a cheap LRU (oldest entry evicted first).
+_cover_cache: Dict[str, str] = {}
+
+
+def _cover_cache_key(title: str, author: str) -> str:
+    """Stable cache key for a (title, author) pair, normalized then hashed."""
+    raw = f"{normalize(title)}|{normalize(author)}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def load_cover_cache() -> None:
+    """
+    Load the persistent cover-URL cache from disk into memory.
+    Called once at startup. Missing or unparsable lines are skipped.
+    """
+    global _cover_cache
+    _cover_cache = {}
+    if not os.path.exists(COVER_CACHE_FILE):
+        return
+    with open(COVER_CACHE_FILE, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                _cover_cache.update(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                continue
+    print(f"[Covers] Loaded {len(_cover_cache)} cached cover URLs from {COVER_CACHE_FILE}")
+
+
+def _cover_cache_store(key: str, url: str) -> None:
+    """Record a freshly resolved cover URL in memory and append it to disk."""
+    if len(_cover_cache) >= COVER_CACHE_MAX_ENTRIES:
+        _cover_cache.pop(next(iter(_cover_cache)))
+    _cover_cache[key] = url
+    try:
+        with open(COVER_CACHE_FILE, "ab") as f:
+            f.write(orjson.dumps({key: url}))
+            f.write(b"\n")
+    except OSError:
+        pass  # cache persistence is best-effort
 
 
-def _get_http_client() -> httpx.Client:
-    """Lazily create a reusable httpx client."""
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Lazily create a reusable async httpx client.
+    HTTP/2 + keep-alive matter here: a fresh TLS handshake costs ~100ms,
+    so warm, multiplexed connections to Open Library / Google Books
+    dominate cover-lookup latency. Transient network errors retry twice.
+    """
     global _http_client
     if _http_client is None:
-        _http_client = httpx.Client(timeout=10.0, follow_redirects=True)
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=16,
+                    keepalive_expiry=30.0,
+                ),
+            ),
+        )
     return _http_client
 
 
-def _cover_from_open_library(title: str, author: str) -> Optional[str]:
+async def _cover_from_open_library(title: str, author: str) -> Optional[str]:
     """Search Open Library for a cover image. Returns URL or None."""
     query = f"{title} {author}".strip() if author else title.strip()
     if not query:
         return None
     url = f"https://openlibrary.org/search.json?q={quote(query)}&limit=1&fields=cover_i"
     try:
-        resp = _get_http_client().get(url)
+        resp = await _get_http_client().get(url)
         if resp.status_code == 200:
-            data = resp.json()
+            data = orjson.loads(resp.content)
             docs = data.get("docs", [])
             if docs and docs[0].get("cover_i"):
                 cover_id = docs[0]["cover_i"]
@@ -308,16 +948,16 @@ def _cover_from_open_library(title: str, author: str) -> Optional[str]:
     return None
 
 
-def _cover_from_google_books(title: str, author: str) -> Optional[str]:
+async def _cover_from_google_books(title: str, author: str) -> Optional[str]:
     """Search Google Books for a cover image. Returns URL or None."""
     query = f"{title} {author}".strip() if author else title.strip()
     if not query:
         return None
     url = f"https://www.googleapis.com/books/v1/volumes?q={quote(query)}&maxResults=1"
     try:
-        resp = _get_http_client().get(url)
+        resp = await _get_http_client().get(url)
         if resp.status_code == 200:
-            data = resp.json()
+            data = orjson.loads(resp.content)
             items = data.get("items", [])
             if items:
                 image_links = items[0].get("volumeInfo", {}).get("imageLinks", {})
@@ -330,22 +970,48 @@ def _cover_from_google_books(title: str, author: str) -> Optional[str]:
     return None
 
 
-def resolve_cover_url(title: str, author: str) -> str:
+async def _cover_url_exists(url: str) -> bool:
+    """
+    Cheap HEAD check that a freshly resolved cover URL actually serves an
+    image, so we never store (and display) a broken one. Network hiccups
+    give the URL the benefit of the doubt — only a definitive 4xx/5xx
+    rejects it. Cache hits skip this entirely.
+    """
+    try:
+        resp = await _get_http_client().head(url, timeout=3.0)
+        return resp.status_code < 400
+    except Exception:
+        return True
+
+
+async def resolve_cover_url(title: str, author: str) -> str:
     """
     Resolve a book cover image URL using the same 3-step fallback as the frontend:
     1. Open Library (title + author)
     2. Google Books (title + author)
     3. Open Library (title only, no author)
     Returns the image URL or empty string if none found.
+    Successful resolutions are cached persistently by (title, author), so
+    repeat uploads / re-imports of known books skip the network entirely.
+    Lookups for a whole batch can be dispatched concurrently (asyncio.gather);
+    the semaphore keeps the number of in-flight requests bounded.
     """
-    url = _cover_from_open_library(title, author)
-    if url:
-        return url
-    url = _cover_from_google_books(title, author)
-    if url:
-        return url
-    url = _cover_from_open_library(title, "")
+    cache_key = _cover_cache_key(title, author)
+    cached = _cover_cache.get(cache_key)
+    if cached:
+        return cached
+    async with _cover_semaphore:
+        url = (
+            await _cover_from_open_library(title, author)
+            or await _cover_from_google_books(title, author)
+            or await _cover_from_open_library(title, "")
+        )
+        if url and not await _cover_url_exists(url):
+            url = None
     if url:
+        # Only cache hits-with-a-URL; misses stay retryable (covers appear
+        # on the providers over time).
+        _cover_cache_store(cache_key, url)
         return url
     return ""
 
@@ -362,6 +1028,7 @@ class RecommendRequest(BaseModel):
     plot_character: str  # → Plot_Character
     mood_finish: str    # → Mood_Finish
     length: str         # → page_count range (short/medium/long/epic)
+    limit: int = 0      # max books returned (0 = no cap, the default)
 
 
 class ConfirmUpdatesRequest(BaseModel):
@@ -424,29 +1091,17 @@ def get_all_books(offset: int = 0, limit: int = 0):
     Return books sorted by sri_Rating desc, then Goodreads popularity desc.
     Supports pagination: ?offset=0&limit=10  (limit=0 means all).
     """
-    def sort_key(book: Dict[str, Any]):
-        sri = book.get("sri_Rating", 0.0)
-        if isinstance(sri, str):
-            try:
-                sri = float(sri)
-            except (TypeError, ValueError):
-                sri = 0.0
-        gr_r = book.get("goodreads_avg_rating", 0.0)
-        if isinstance(gr_r, str):
-            try:
-                gr_r = float(gr_r)
-            except (TypeError, ValueError):
-                gr_r = 0.0
-        gr_v = book.get("goodreads_rating_count", 0)
-        if isinstance(gr_v, str):
-            try:
-                gr_v = int(gr_v)
-            except (TypeError, ValueError):
-                gr_v = 0
-        gr_pop = gr_r * math.log(1 + gr_v)
-        return (-sri, -gr_pop)
-
-    sorted_books = sorted(books_db.values(), key=sort_key)
+    # Ranking fields are precomputed at ingest (_compute_sort_key), so the
+    # sort key is two cached float reads per book — and the sorted list
+    # itself is cached across requests, invalidated by any mutation, so
+    # the steady-state cost here is just the page slice.
+    global _sorted_cache
+    if _sorted_cache is None:
+        _sorted_cache = sorted(
+            books_db.values(),
+            key=lambda book: (-book.get("_sort_sri", 0.0), -book.get("_sort_gr_pop", 0.0)),
+        )
+    sorted_books = _sorted_cache
     total = len(sorted_books)
 
     if limit > 0:
@@ -454,7 +1109,16 @@ def get_all_books(offset: int = 0, limit: int = 0):
     else:
         page = sorted_books[offset:] if offset > 0 else sorted_books
 
-    return {"books": page, "count": total, "offset": offset, "limit": limit}
+    # Stream the body instead of handing FastAPI one big list to encode:
+    # the full-catalog request never materializes the serialized response.
+    return StreamingResponse(
+        _json_stream(
+            b'{"books":[',
+            (_public_book(book) for book in page),
+            b'],"count":%d,"offset":%d,"limit":%d}' % (total, offset, limit),
+        ),
+        media_type="application/json",
+    )
 
 
 @app.put("/books/{book_id}")
@@ -473,23 +1137,48 @@ def update_book(book_id: str, body: BookUpdateRequest, x_admin_key: Optional[str
     if not changes:
         raise HTTPException(status_code=400, detail="No fields to update.")
 
+    # Only title/author feed the record key and the title+author index
+    # (book_ID is not editable), so skip the whole re-key pipeline when
+    # neither changed — the common case of tweaking ratings or categories.
+    key_fields_changed = "book_title" in changes or "book_author" in changes
+    old_ta = _ta_key(book) if key_fields_changed else None
+
     old_values = {}
     for field, new_val in changes.items():
         old_values[field] = book.get(field)
         book[field] = new_val
-
-    # If book_ID itself hasn't changed, the key stays the same.
-    # If title or author changed (fallback key), re-key if needed.
-    new_key = _book_key(book)
+    if any(f in changes for f in _DERIVED_SOURCE_FIELDS):
+        _stamp_derived(book)
+
+    new_key = book_id
+    if key_fields_changed:
+        # If book_ID itself hasn't changed, the key stays the same.
+        # If title or author changed (fallback key), re-key if needed.
+        new_key = _book_key(book)
+        if new_key != book_id:
+            books_db[new_key] = book
+            del books_db[book_id]
+            _missing_covers.discard(book_id)
+            _track_cover(new_key, book)
+
+        # Keep the title+author index pointing at the right record
+        new_ta = _ta_key(book)
+        if old_ta != new_ta and _key_index.get(old_ta) == book_id:
+            del _key_index[old_ta]
+        _index_add(new_ta, new_key)
+
+    # Upsert first, tombstone second: a crash between the two appends then
+    # replays to a recoverable duplicate under both keys, whereas writing
+    # the durable tombstone first would replay to the book being gone.
+    _append_op("upsert", book=book)
     if new_key != book_id:
-        books_db[new_key] = book
-        del books_db[book_id]
-
-    save_db()
+        # Tombstone the old key so replay doesn't resurrect it
+        _append_op("delete", book_id=book_id)
+    _mark_soa_dirty()
 
     return {
         "message": f"Book '{book.get('book_title', book_id)}' updated.",
-        "book": book,
+        "book": _public_book(book),
         "changed_fields": {k: {"old": old_values[k], "new": v} for k, v in changes.items()},
     }
 
@@ -502,7 +1191,11 @@ def delete_book(book_id: str, x_admin_key: Optional[str] = Header(None)):
         raise HTTPException(status_code=404, detail=f"Book '{book_id}' not found.")
 
     removed = books_db.pop(book_id)
-    save_db()
+    if _key_index.get(_ta_key(removed)) == book_id:
+        del _key_index[_ta_key(removed)]
+    _missing_covers.discard(book_id)
+    _append_op("delete", book_id=book_id)
+    _mark_soa_dirty()
 
     return {
         "message": f"Book '{removed.get('book_title', book_id)}' deleted.",
@@ -532,21 +1225,24 @@ async def upload_csv(file: UploadFile = File(...), x_admin_key: Optional[str] =
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a .csv file.")
 
-    contents = await file.read()
+    loop = asyncio.get_running_loop()
     try:
-        text = contents.decode("utf-8")
+        # CSV parsing is pure CPU work; run it on the threadpool so the
+        # event loop stays free for health checks and other requests.
+        # It streams from the spooled upload file rather than from an
+        # await file.read() copy of the whole body.
+        file.file.seek(0)
+        rows, col_idx = await loop.run_in_executor(None, _read_csv_rows, file.file)
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be UTF-8 encoded.")
 
-    reader = csv.DictReader(io.StringIO(text))
-    rows = list(reader)
-
     if not rows:
         raise HTTPException(status_code=400, detail="CSV file is empty.")
 
-    # Check required columns exist
-    first = rows[0]
-    missing = [c for c in CSV_COLUMNS if c not in first]
+    # Check required columns exist (against the header map for positional
+    # rows, or the first row's keys for the dict path)
+    columns_present = col_idx if col_idx is not None else rows[0]
+    missing = [c for c in CSV_COLUMNS if c not in columns_present]
     if missing:
         raise HTTPException(
             status_code=400,
@@ -562,39 +1258,34 @@ async def upload_csv(file: UploadFile = File(...), x_admin_key: Optional[str] =
     pending_conflicts = {}
 
     for row in rows:
-        new_book = parse_book_row(row)
+        new_book = parse_book_row(row, col_idx)
 
         # --- Find an existing match ------------------------------------------
         # If CSV provides a book_ID, check by ID first.
         # Otherwise (or if ID not found), check by title+author combo.
-        key = None
         csv_has_id = bool(new_book.get("book_ID"))
+        # Computed once per row; reused for the dedup lookup and, if the
+        # book turns out to be new, the index insertion below.
+        ta = _ta_key(new_book)
 
         if csv_has_id and new_book["book_ID"] in books_db:
             key = new_book["book_ID"]
         else:
-            # Search by title+author among existing books
-            ta_key = (
-                str(new_book.get("book_title", "")).strip().lower()
-                + "|"
-                + str(new_book.get("book_author", "")).strip().lower()
-            )
-            for existing_key, existing_book in books_db.items():
-                existing_ta = (
-                    str(existing_book.get("book_title", "")).strip().lower()
-                    + "|"
-                    + str(existing_book.get("book_author", "")).strip().lower()
-                )
-                if ta_key == existing_ta:
-                    key = existing_key
-                    break
+            # Bloom filter answers "definitely new" without a dict lookup;
+            # positives fall back to the authoritative index.
+            key = _key_index.get(ta) if _bloom_contains(ta) else None
 
         if key is None:
             # ----- Case 1: New book → auto-assign ID and add -----------------
             if not new_book.get("book_ID"):
                 new_book["book_ID"] = _next_book_id()
+            else:
+                # CSV carried its own ID; make sure the counter stays ahead
+                _register_book_id(new_book["book_ID"])
             db_key = _book_key(new_book)
             books_db[db_key] = new_book
+            _index_add(ta, db_key)
+            _track_cover(db_key, new_book)
             added_books.append({
                 "book_ID": new_book["book_ID"],
                 "book_title": new_book["book_title"],
@@ -614,9 +1305,12 @@ async def upload_csv(file: UploadFile = File(...), x_admin_key: Optional[str] =
             # Carry over the existing book_ID so the conflict references the right record
             new_book["book_ID"] = books_db[key].get("book_ID", key)
             diffs = diff_fields(books_db[key], new_book)
+            # Cache the diff alongside the conflict so /conflicts can serve
+            # it without re-walking both records.
             pending_conflicts[key] = {
                 "old": books_db[key],
                 "new": new_book,
+                "diffs": diffs,
             }
             conflicted_books.append({
                 "book_ID": new_book["book_ID"],
@@ -625,28 +1319,46 @@ async def upload_csv(file: UploadFile = File(...), x_admin_key: Optional[str] =
                 "differences": diffs,
             })
 
-    # Persist newly added books to disk
+    # Persist newly added books to disk (one log append per book).
+    # The serialization still goes to the threadpool; the fsync for the
+    # whole batch is coalesced by the background flusher.
     if added_books:
-        save_db()
+        def _persist_added() -> None:
+            for info in added_books:
+                if info["book_ID"] in books_db:
+                    _append_op("upsert", book=books_db[info["book_ID"]])
 
-    # Resolve cover images for all newly added books
+        await loop.run_in_executor(None, _persist_added)
+        _mark_soa_dirty()
+
+    # Resolve cover images for all newly added books, concurrently.
+    # gather() makes the batch cost roughly one (slowest) lookup instead of
+    # the sum of all of them; the semaphore in resolve_cover_url caps QPS.
     covers_resolved = 0
     if added_books:
         print(f"[Covers] Resolving cover images for {len(added_books)} new books...")
-        for info in added_books:
-            bid = info["book_ID"]
-            if bid in books_db:
-                book = books_db[bid]
-                search_title = book.get("cover_search_title") or book.get("book_title", "")
-                author = book.get("book_author", "")
-                cover_url = resolve_cover_url(search_title, author)
-                book["cover_image_url"] = cover_url
-                if cover_url:
-                    covers_resolved += 1
-                    print(f"  [OK] {book.get('book_title', bid)}")
-                else:
-                    print(f"  [--] {book.get('book_title', bid)} (no cover found)")
-        save_db()
+        targets = [books_db[info["book_ID"]] for info in added_books if info["book_ID"] in books_db]
+        cover_urls = await asyncio.gather(*(
+            resolve_cover_url(
+                book.get("cover_search_title") or book.get("book_title", ""),
+                book.get("book_author", ""),
+            )
+            for book in targets
+        ))
+        for book, cover_url in zip(targets, cover_urls):
+            book["cover_image_url"] = cover_url
+            _track_cover(_book_key(book), book)
+            if cover_url:
+                covers_resolved += 1
+                print(f"  [OK] {book.get('book_title', '?')}")
+            else:
+                print(f"  [--] {book.get('book_title', '?')} (no cover found)")
+
+        def _persist_covers() -> None:
+            for book in targets:
+                _append_op("upsert", book=book)
+
+        await loop.run_in_executor(None, _persist_covers)
         print(f"[Covers] Done. {covers_resolved}/{len(added_books)} covers found.")
 
     return {
@@ -685,9 +1397,14 @@ def confirm_updates(body: ConfirmUpdatesRequest, x_admin_key: Optional[str] = He
     for bid in body.book_ids:
         bid_stripped = bid.strip()
         if bid_stripped in pending_conflicts:
-            # Apply the new version
+            # Apply the new version (re-indexing in case title/author changed)
+            old_book = pending_conflicts[bid_stripped]["old"]
             new_book = pending_conflicts[bid_stripped]["new"]
+            if _key_index.get(_ta_key(old_book)) == bid_stripped:
+                del _key_index[_ta_key(old_book)]
             books_db[bid_stripped] = new_book
+            _index_add(_ta_key(new_book), bid_stripped)
+            _track_cover(bid_stripped, new_book)
             updated.append(bid_stripped)
             # Remove from pending once applied
             del pending_conflicts[bid_stripped]
@@ -696,7 +1413,9 @@ def confirm_updates(body: ConfirmUpdatesRequest, x_admin_key: Optional[str] = He
 
     # Persist changes to disk
     if updated:
-        save_db()
+        for bid in updated:
+            _append_op("upsert", book=books_db[bid])
+        _mark_soa_dirty()
 
     return {
         "message": f"Updated {len(updated)} books.",
@@ -712,23 +1431,27 @@ def confirm_updates(body: ConfirmUpdatesRequest, x_admin_key: Optional[str] = He
 @app.get("/conflicts")
 def get_conflicts():
     """Return all pending conflicts from the last CSV upload."""
-    result = []
-    for key, conflict in pending_conflicts.items():
-        diffs = diff_fields(conflict["old"], conflict["new"])
-        result.append({
+    items = (
+        {
             "book_ID": conflict["new"].get("book_ID", key),
             "book_title": conflict["new"].get("book_title", ""),
             "book_author": conflict["new"].get("book_author", ""),
-            "differences": diffs,
-        })
-    return {"conflicts": result, "count": len(result)}
+            # Diffed once at upload time; conflicts are immutable after that.
+            "differences": conflict["diffs"],
+        }
+        for key, conflict in pending_conflicts.items()
+    )
+    return StreamingResponse(
+        _json_stream(b'{"conflicts":[', items, b'],"count":%d}' % len(pending_conflicts)),
+        media_type="application/json",
+    )
 
 
 # ---- Resolve / refresh cover images ----------------------------------------
 
 
 @app.post("/resolve-covers")
-def resolve_covers(
+async def resolve_covers(
     force: bool = False,
     x_admin_key: Optional[str] = Header(None),
 ):
@@ -744,17 +1467,26 @@ def resolve_covers(
 
     resolved = 0
     failed = 0
-    skipped = 0
-
-    for book in books_db.values():
-        existing = book.get("cover_image_url", "")
-        if existing and not force:
-            skipped += 1
-            continue
-        search_title = book.get("cover_search_title") or book.get("book_title", "")
-        author = book.get("book_author", "")
-        cover_url = resolve_cover_url(search_title, author)
+    # force=False walks only the missing-covers set (O(missing), not O(DB)).
+    if force:
+        targets = list(books_db.values())
+    else:
+        targets = [books_db[key] for key in _missing_covers if key in books_db]
+    skipped = len(books_db) - len(targets)
+
+    # Same concurrent pattern as the upload path: one gather over all
+    # lookups, bounded by the semaphore inside resolve_cover_url, so a
+    # DB-wide pass costs roughly the slowest lookup rather than the sum.
+    cover_urls = await asyncio.gather(*(
+        resolve_cover_url(
+            book.get("cover_search_title") or book.get("book_title", ""),
+            book.get("book_author", ""),
+        )
+        for book in targets
+    ))
+    for book, cover_url in zip(targets, cover_urls):
         book["cover_image_url"] = cover_url
+        _track_cover(_book_key(book), book)
         if cover_url:
             resolved += 1
             print(f"  [OK] {book.get('book_title', '?')}")
@@ -762,7 +1494,11 @@ def resolve_covers(
             failed += 1
             print(f"  [--] {book.get('book_title', '?')} (no cover found)")
 
-    save_db()
+    def _persist_covers() -> None:
+        for book in targets:
+            _append_op("upsert", book=book)
+
+    await asyncio.get_running_loop().run_in_executor(None, _persist_covers)
 
     return {
         "message": f"Cover resolution complete. {resolved} found, {failed} not found, {skipped} skipped (already had cover).",
@@ -803,81 +1539,62 @@ def recommend(body: RecommendRequest):
 
     # --- Step 1: Filter by Genre_Intent --------------------------------------
     genre_filter = normalize(body.genre_intent)
-    filtered_books = [
-        book for book in books_db.values()
-        if normalize(book.get("Genre_Intent")) == genre_filter
-    ]
-
-    # Page-count ranges for the length preference
-    def page_range_for_length(length_key: str) -> Tuple[int, int]:
-        key = normalize(length_key)
-        if key == "short":
-            return (0, 200)
-        if key == "medium":
-            return (201, 400)
-        if key == "long":
-            return (401, 600)
-        if key == "epic":
-            return (601, 100_000)
-        return (0, 0)
 
+    # Length preference → precomputed bucket code (-2 matches no book)
     length_key = body.length
-    length_low, length_high = page_range_for_length(length_key)
+    length_code = LENGTH_CODES.get(normalize(length_key), -2)
+
+    # Normalize each user preference exactly once, up front; the scoring
+    # step below reads the precomputed values instead of re-normalizing.
+    user_norms = {f: normalize(v) for f, v in user_values.items()}
 
     # Determine which fields are actually being scored (exclude "any")
-    active_fields = [
-        f for f in SCORING_FIELDS if normalize(user_values.get(f)) != "any"
-    ]
+    active_fields = [f for f in SCORING_FIELDS if user_norms[f] != "any"]
     length_active = normalize(length_key) != "any"
     max_score = len(active_fields) + (1 if length_active else 0)
 
-    # --- Step 2: Score filtered books ----------------------------------------
-    scored: List[Tuple[Dict[str, Any], int, float, float]] = []
-    for book in filtered_books:
-        score = 0
-        for field in active_fields:
-            if normalize(book.get(field)) == normalize(user_values.get(field)):
-                score += 1
-        # Length: only score if user specified a preference
-        if length_active:
-            try:
-                pages = int(book.get("page_count") or 0)
-                if length_low <= pages <= length_high:
-                    score += 1
-            except (TypeError, ValueError):
-                pass
-        sri_rating = book.get("sri_Rating", 0.0)
-        if isinstance(sri_rating, str):
-            try:
-                sri_rating = float(sri_rating)
-            except (TypeError, ValueError):
-                sri_rating = 0.0
-
-        # Second tiebreaker: Goodreads popularity = R * log(1 + v)
-        gr_rating = book.get("goodreads_avg_rating", 0.0)
-        if isinstance(gr_rating, str):
-            try:
-                gr_rating = float(gr_rating)
-            except (TypeError, ValueError):
-                gr_rating = 0.0
-        gr_count = book.get("goodreads_rating_count", 0)
-        if isinstance(gr_count, str):
-            try:
-                gr_count = int(gr_count)
-            except (TypeError, ValueError):
-                gr_count = 0
-        gr_popularity = gr_rating * math.log(1 + gr_count)
-
-        scored.append((book, score, float(sri_rating), gr_popularity))
-
-    # Sort: primary = score desc, secondary = sri_Rating desc, tertiary = GR popularity desc
-    scored.sort(key=lambda x: (-x[1], -x[2], -x[3]))
-
-    # Build response list
+    # --- Step 2: Score all books in one vectorized pass ----------------------
+    # Genre filtering and per-field matching run as NumPy array ops over the
+    # columnar store; unseen user values get code -1, which matches nothing.
+    _ensure_soa()
+    arrays = _soa_arrays
+    n = len(_soa_books)
+    genre_code = _soa_codes.get("Genre_Intent", {}).get(genre_filter, -1)
+    genre_mask = arrays["Genre_Intent"] == genre_code
+
+    score = np.zeros(n, dtype=np.int8)
+    for field in active_fields:
+        code = _soa_codes.get(field, {}).get(user_norms[field], -1)
+        score += arrays[field] == code
+    if length_active:
+        score += arrays["length_bucket"] == length_code
+
+    # Sort matches: score desc, then sri_Rating desc, then GR popularity desc
+    # (lexsort's last key is the primary one).
+    idx = np.nonzero(genre_mask)[0]
+    if idx.size:
+        order = np.lexsort((
+            -arrays["gr_popularity"][idx],
+            -arrays["sri_rating"][idx],
+            -score[idx],
+        ))
+        idx = idx[order]
+        # Trim only after the full ordering: scores are tiny integers, so
+        # ties at the k-th score are the common case, and a cut on score
+        # alone would drop arbitrary members of the tie group before the
+        # rating/popularity tiebreakers ever ran.
+        if 0 < body.limit < idx.size:
+            idx = idx[:body.limit]
+
+    # Build the response list. The frontend reads match_score/max_score off
+    # each book, so returned rows get one flat copy each (mutating the
+    # stored records would leak per-request scores into the DB). tolist()
+    # converts indices and scores in bulk instead of one numpy scalar at a
+    # time, so the loop is plain-int dict work.
     result = []
-    for book, score, _, _ in scored:
-        out = dict(book)
-        out["match_score"] = score
+    for i, s in zip(idx.tolist(), score[idx].tolist()):
+        out = _public_book(_soa_books[i])
+        out["match_score"] = s
         out["max_score"] = max_score
         result.append(out)
 